@@ -4,16 +4,21 @@
 
 """Charmed Machine Operator for Kubernetes Control Plane."""
 
+import contextlib
 import functools
+import hashlib
+import json
 import logging
 import os
 import re
 import shlex
+import shutil
 import socket
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from subprocess import CalledProcessError
-from typing import Callable, List
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import charms.contextual_status as status
 import charms.node_base.address as node_address
@@ -54,6 +59,12 @@ log = logging.getLogger(__name__)
 
 OBSERVABILITY_ROLE = "system:cos"
 
+# Legacy leadership data keys and the peer relation keys they migrate to
+LEGACY_LEADER_KEYS = {
+    "cluster_tag": "cluster-name",
+    "/root/cdk/serviceaccount.key": "service-account-key",
+}
+
 
 class RefreshCosAgent(ops.EventBase):
     """Event to trigger a refresh of the COS agent."""
@@ -65,6 +76,71 @@ class MissingCNIError(Exception):
     ERR = "Missing CNI relation or config"
 
 
+class ReconcileContext:
+    """Lookups which hold constant for the duration of a single reconcile.
+
+    Each attribute is resolved on first access and reused afterwards, which
+    avoids repeating the same hook-tool and network queries from every
+    helper involved in a reconcile.
+    """
+
+    def __init__(self, charm: "KubernetesControlPlaneCharm"):
+        self._charm = charm
+        self.tokens: Dict[Tuple[str, str, Tuple[str, ...]], str] = {}
+
+    @functools.cached_property
+    def public_address(self) -> str:
+        return kubernetes_snaps.get_public_address()
+
+    @functools.cached_property
+    def node_name(self) -> str:
+        return self._charm.get_node_name()
+
+    @functools.cached_property
+    def node_ips(self) -> List[str]:
+        return self._charm._get_node_ips()
+
+    @functools.cached_property
+    def ingress_addrs(self) -> List[str]:
+        return node_address.by_relation(self._charm, "kube-control", True)
+
+    @functools.cached_property
+    def bind_addrs(self) -> List[str]:
+        return kubernetes_snaps.get_bind_addresses()
+
+    @functools.cached_property
+    def hostname(self) -> str:
+        return socket.gethostname()
+
+    @functools.cached_property
+    def fqdn(self) -> str:
+        return socket.getfqdn()
+
+    @functools.cached_property
+    def peer_relation(self) -> Optional[ops.Relation]:
+        return self._charm.model.get_relation("peer")
+
+    @functools.cached_property
+    def peer_app_data(self) -> Optional[ops.RelationDataContent]:
+        return self.peer_relation and self.peer_relation.data[self._charm.app]
+
+    @functools.cached_property
+    def legacy_leader_data(self) -> Dict[str, str]:
+        return leader_data.get_all()
+
+    @functools.cached_property
+    def service_cidr(self) -> str:
+        return self._charm.model.config["service-cidr"]
+
+    @functools.cached_property
+    def dns_domain(self) -> str:
+        return self._charm.get_dns_domain()
+
+    @functools.cached_property
+    def extra_sans(self) -> List[str]:
+        return self._charm.model.config["extra_sans"].split()
+
+
 def charm_track() -> str:
     """Get the charm track based on the current charm branch.
 
@@ -107,11 +183,14 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
     """Charmed Operator for Kubernetes Control Plane."""
 
     observability_refresh = ops.EventSource(RefreshCosAgent)
+    _stored = ops.StoredState()
 
     APISERVER_PORT = 6443
 
     def __init__(self, *args):
         super().__init__(*args)
+        self._stored.set_default(certificates_request_hash="", last_reconcile_hash="")
+        self._context = ReconcileContext(self)
         self.cdk_addons = CdkAddons(self)
         self.certificates = CertificatesRequires(self, endpoint="certificates")
         self.cni = KubernetesCniProvides(
@@ -184,7 +263,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
 
     @status.on_error(ops.WaitingStatus("Waiting on valid certificate data"))
     def api_dependencies_ready(self):
-        common_name = kubernetes_snaps.get_public_address()
+        common_name = self._context.public_address
         ca = self.certificates.ca
         client_cert = self.certificates.client_certs_map.get("system:kube-apiserver")
         server_cert = self.certificates.server_certs_map.get(common_name)
@@ -236,7 +315,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
     def configure_apiserver(self):
         status.add(ops.MaintenanceStatus("Configuring API Server"))
         kubernetes_snaps.configure_apiserver(
-            advertise_address=self._get_node_ips()[0],
+            advertise_address=self._context.node_ips[0],
             audit_policy=self.model.config["audit-policy"],
             audit_webhook_conf=self.model.config["audit-webhook-config"],
             auth_webhook_conf=auth_webhook.auth_webhook_conf,
@@ -245,7 +324,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
             etcd_connection_string=self.etcd.get_connection_string(),
             extra_args_config=self.service_extra_args("kube-apiserver", "api-extra-args"),
             privileged=self.allows_privileged,
-            service_cidr=self.model.config["service-cidr"],
+            service_cidr=self._context.service_cidr,
             external_cloud_provider=self.external_cloud_provider,
             authz_webhook_conf_file=auth_webhook.authz_webhook_conf,
         )
@@ -334,7 +413,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         status.add(ops.MaintenanceStatus("Configuring CNI"))
         self.cni.set_image_registry(self.model.config["image-registry"])
         self.cni.set_kubeconfig_hash_from_file(ROOT_KUBECONFIG)
-        self.cni.set_service_cidr(self.model.config["service-cidr"])
+        self.cni.set_service_cidr(self._context.service_cidr)
 
         ignore_missing_cni = self.model.config["ignore-missing-cni"]
         conf_file = self.cni.cni_conf_file
@@ -359,7 +438,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
                 "kube-controller-manager", "controller-manager-extra-args"
             ),
             kubeconfig="/root/cdk/kubecontrollermanagerconfig",
-            service_cidr=self.model.config["service-cidr"],
+            service_cidr=self._context.service_cidr,
             external_cloud_provider=self.external_cloud_provider,
         )
 
@@ -382,7 +461,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
     def configure_kube_control(self):
         status.add(ops.MaintenanceStatus("Configuring Kube Control"))
         dns_address = self.get_dns_address()
-        dns_domain = self.get_dns_domain()
+        dns_domain = self._context.dns_domain
         dns_enabled = bool(dns_address)
         dns_port = self.get_dns_port()
 
@@ -403,7 +482,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
             proxy_token = auth_webhook.get_token("system:kube-proxy")
 
             for request in self.kube_control.auth_requests:
-                kubelet_token = auth_webhook.create_token(
+                kubelet_token = self._cached_token(
                     uid=request.unit, username=request.user, groups=[request.group]
                 )
                 self.kube_control.sign_auth_request(
@@ -429,13 +508,13 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         status.add(ops.MaintenanceStatus("Configuring Kubelet"))
         kubernetes_snaps.configure_kubelet(
             container_runtime_endpoint=self.container_runtime.socket,
-            dns_domain=self.get_dns_domain(),
+            dns_domain=self._context.dns_domain,
             dns_ip=self.get_dns_address(),
             extra_args_config=self.service_extra_args("kubelet", "kubelet-extra-args"),
             extra_config=yaml.safe_load(self.model.config["kubelet-extra-config"]),
             external_cloud_provider=self.external_cloud_provider,
             kubeconfig="/root/cdk/kubeconfig",
-            node_ip=",".join(self._get_node_ips()),
+            node_ip=",".join(self._context.node_ips),
             registry=self.model.config["image-registry"],
             taints=self.model.config["register-with-taints"].split(),
         )
@@ -484,94 +563,195 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
             kubeconfig="/root/cdk/kubeschedulerconfig",
         )
 
-    @status.on_error(ops.WaitingStatus("Waiting for Auth Tokens"), CalledProcessError)
+    @status.on_error(ops.WaitingStatus("Waiting for Auth Tokens"), CalledProcessError, OSError)
     def create_kubeconfigs(self):
         status.add(ops.MaintenanceStatus("Creating kubeconfigs"))
         ca = self.certificates.ca
         local_server = self.k8s_api_endpoints.local()
-        node_name = self.get_node_name()
+        node_name = self._context.node_name
         public_server = self.k8s_api_endpoints.external()
 
-        if not os.path.exists(ROOT_KUBECONFIG):
-            # Create a bootstrap client config. This initial config will allow
-            # us to get and create auth webhook tokens via the Kubernetes API,
-            # but will not have the final admin token just yet.
-            token = auth_webhook.token_generator()
-        else:
-            token = None
+        self._update_kubeconfig_if_changed(ROOT_KUBECONFIG, ca=ca, server=local_server)
 
-        kubernetes_snaps.update_kubeconfig(
-            ROOT_KUBECONFIG,
-            ca=ca,
-            server=local_server,
-            token=token,
-            user="admin",
-        )
-
-        admin_token = auth_webhook.create_token(
+        admin_token = self._cached_token(
             uid="admin",
             username="admin",
             groups=["system:masters"],  # wokeignore:rule=master
         )
 
-        for dest in [ROOT_KUBECONFIG, "/home/ubuntu/.kube/config"]:
-            kubernetes_snaps.create_kubeconfig(
-                dest,
-                ca=ca,
-                server=local_server,
-                token=admin_token,
-                user="admin",
+        kubeconfigs = [
+            (ROOT_KUBECONFIG, local_server, admin_token, "admin"),
+            ("/home/ubuntu/.kube/config", local_server, admin_token, "admin"),
+            ("/home/ubuntu/config", public_server, admin_token, "admin"),
+            (
+                "/root/cdk/kubecontrollermanagerconfig",
+                local_server,
+                self._cached_token(
+                    uid="kube-controller-manager",
+                    username="system:kube-controller-manager",
+                    groups=[],
+                ),
+                "kube-controller-manager",
+            ),
+            (
+                "/root/cdk/kubeschedulerconfig",
+                local_server,
+                self._cached_token(
+                    uid="system:kube-scheduler", username="system:kube-scheduler", groups=[]
+                ),
+                "kube-scheduler",
+            ),
+            (
+                "/root/cdk/kubeconfig",
+                local_server,
+                self._cached_token(
+                    uid=self.unit.name,
+                    username=f"system:node:{node_name.lower()}",
+                    groups=["system:nodes"],
+                ),
+                "kubelet",
+            ),
+            (
+                "/root/cdk/kubeproxyconfig",
+                local_server,
+                self._cached_token(uid="kube-proxy", username="system:kube-proxy", groups=[]),
+                "kube-proxy",
+            ),
+        ]
+
+        def write(kubeconfig) -> bool:
+            dest, server, token, user = kubeconfig
+            return self._write_kubeconfig_if_changed(
+                dest, ca=ca, server=server, token=token, user=user
             )
 
-        kubernetes_snaps.create_kubeconfig(
-            "/home/ubuntu/config",
-            ca=ca,
-            server=public_server,
-            token=admin_token,
-            user="admin",
-        )
+        # The kubeconfigs are independent files, so write them concurrently
+        written, error = False, None
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(write, kubeconfig) for kubeconfig in kubeconfigs]
+            for future in as_completed(futures):
+                try:
+                    written |= future.result()
+                except Exception as e:
+                    error = error or e
+        # Flush all rewritten kubeconfigs to disk at once rather than per file
+        if written:
+            os.sync()
+        if error:
+            raise error
+
+    def _cached_token(self, uid: str, username: str, groups: List[str]) -> str:
+        """Create an auth webhook token at most once per reconcile."""
+        key = (uid, username, tuple(groups))
+        if key not in self._context.tokens:
+            self._context.tokens[key] = auth_webhook.create_token(
+                uid=uid, username=username, groups=groups
+            )
+        return self._context.tokens[key]
+
+    def _write_kubeconfig_if_changed(
+        self, dest: Union[str, Path], ca: str, server: str, token: str, user: str
+    ) -> bool:
+        """Create a kubeconfig unless an identical one is already in place.
+
+        A sha256 digest of the kubeconfig inputs is kept next to the file in
+        ``<dest>.hash``, so unchanged kubeconfigs are neither rewritten nor
+        trigger a restart of the services reading them.
+
+        Returns:
+            bool: True if the kubeconfig was written.
+        """
+        digest = hashlib.sha256("|".join([ca, server, token, user]).encode()).hexdigest()
+        hash_file = Path(f"{dest}.hash")
+        if self._read_hash(hash_file) == digest and os.path.exists(dest):
+            log.debug("Kubeconfig %s is unchanged", dest)
+            return False
 
-        kubernetes_snaps.create_kubeconfig(
-            "/root/cdk/kubecontrollermanagerconfig",
-            ca=ca,
-            server=local_server,
-            token=auth_webhook.create_token(
-                uid="kube-controller-manager", username="system:kube-controller-manager", groups=[]
-            ),
-            user="kube-controller-manager",
-        )
+        with self._staged_kubeconfig(Path(dest)) as tmp:
+            kubernetes_snaps.create_kubeconfig(
+                str(tmp), ca=ca, server=server, token=token, user=user
+            )
+        hash_file.write_text(digest)
+        return True
 
-        kubernetes_snaps.create_kubeconfig(
-            "/root/cdk/kubeschedulerconfig",
-            ca=ca,
-            server=local_server,
-            token=auth_webhook.create_token(
-                uid="system:kube-scheduler", username="system:kube-scheduler", groups=[]
-            ),
-            user="kube-scheduler",
-        )
+    def _update_kubeconfig_if_changed(self, dest: Union[str, Path], ca: str, server: str):
+        """Point the admin kubeconfig at the current CA and API server.
+
+        A missing kubeconfig is created with a bootstrap token. This initial
+        config allows us to get and create auth webhook tokens via the
+        Kubernetes API, but will not have the final admin token just yet.
+
+        An existing kubeconfig is only updated when the CA or server changed
+        since the last update, recorded in ``<dest>.server.hash``. Updates are
+        made to a copy which then atomically replaces the kubeconfig.
+        """
+        digest = hashlib.sha256("|".join([ca, server]).encode()).hexdigest()
+        hash_file = Path(f"{dest}.server.hash")
+        exists = os.path.exists(dest)
+        if exists and self._read_hash(hash_file) == digest:
+            log.debug("Kubeconfig %s server is unchanged", dest)
+            return
 
-        kubernetes_snaps.create_kubeconfig(
-            "/root/cdk/kubeconfig",
-            ca=ca,
-            server=local_server,
-            token=auth_webhook.create_token(
-                uid=self.unit.name,
-                username=f"system:node:{node_name.lower()}",
-                groups=["system:nodes"],
-            ),
-            user="kubelet",
-        )
+        with self._staged_kubeconfig(Path(dest)) as tmp:
+            if exists:
+                shutil.copyfile(dest, tmp)
+                kubernetes_snaps.update_kubeconfig(
+                    str(tmp), ca=ca, server=server, token=None, user="admin"
+                )
+            else:
+                kubernetes_snaps.create_kubeconfig(
+                    str(tmp),
+                    ca=ca,
+                    server=server,
+                    token=auth_webhook.token_generator(),
+                    user="admin",
+                )
+                # Any recorded hash no longer describes the file on disk
+                Path(f"{dest}.hash").unlink(missing_ok=True)
+        hash_file.write_text(digest)
 
-        kubernetes_snaps.create_kubeconfig(
-            "/root/cdk/kubeproxyconfig",
-            ca=ca,
-            server=local_server,
-            token=auth_webhook.create_token(
-                uid="kube-proxy", username="system:kube-proxy", groups=[]
-            ),
-            user="kube-proxy",
-        )
+    @staticmethod
+    def _read_hash(hash_file: Path) -> Optional[str]:
+        try:
+            return hash_file.read_text()
+        except FileNotFoundError:
+            return None
+
+    @contextlib.contextmanager
+    def _staged_kubeconfig(self, dest: Path):
+        """Stage a kubeconfig in a temporary file, then move it into place.
+
+        The temporary file is created empty and owner-only before any token
+        is written to it, and is removed again if staging or replacing fails.
+        """
+        tmp = Path(f"{dest}.tmp")
+        tmp.unlink(missing_ok=True)
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        os.close(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+        try:
+            yield tmp
+            self._replace_kubeconfig(tmp, dest)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _replace_kubeconfig(tmp: Path, dest: Path):
+        """Atomically move a freshly written kubeconfig into place.
+
+        The temporary file is fsynced before replacing the kubeconfig, so
+        readers such as kubelet or kube-proxy never see a partially written
+        or empty file, even after a crash. Kubeconfigs inside a home directory
+        are owned by that home's user so they remain readable with the
+        restricted file mode.
+        """
+        if dest.is_relative_to("/home") and len(dest.parts) > 3:
+            home = Path(*dest.parts[:3]).stat()
+            os.chown(tmp, home.st_uid, home.st_gid)
+        tmp.chmod(0o600)
+        with tmp.open("rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, dest)
 
     def configure_observability(self):
         """Apply observability configurations to the cluster."""
@@ -580,9 +760,9 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         if self.unit.is_leader():
             kubectl("apply", "-f", "templates/observability.yaml")
         # Issue a token for metrics scraping
-        node_name = self.get_node_name()
+        node_name = self._context.node_name
         cos_user = f"system:cos:{node_name}"
-        auth_webhook.create_token(
+        self._cached_token(
             uid=self.model.unit.name, username=cos_user, groups=[OBSERVABILITY_ROLE]
         )
         self.observability_refresh.emit()
@@ -597,7 +777,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
 
         for request in self.tokens.token_requests:
             tokens = {
-                user: auth_webhook.create_token(uid=request.unit, username=user, groups=[group])
+                user: self._cached_token(uid=request.unit, username=user, groups=[group])
                 for user, group in request.requests.items()
             }
             self.tokens.send_token(request, tokens)
@@ -605,9 +785,9 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
     @status.on_error(ops.WaitingStatus("Waiting for cluster name"))
     def get_cluster_name(self) -> str:
         """Get the cluster name from the kube-control relation."""
-        peer_relation = self.model.get_relation("peer")
-        assert peer_relation, "Peer relation not ready"
-        cluster_name = peer_relation.data[self.app].get("cluster-name")
+        peer_data = self._context.peer_app_data
+        assert peer_data is not None, "Peer relation not ready"
+        cluster_name = peer_data.get("cluster-name")
 
         if cluster_name:
             return cluster_name
@@ -615,14 +795,13 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         assert self.unit.is_leader(), "Waiting for cluster name from leader"
 
         # Check for old cluster name in leader data
-        cluster_name = leader_data.get("cluster_tag")
+        self._migrate_leader_data(peer_data)
+        cluster_name = peer_data.get("cluster-name")
         if cluster_name:
-            peer_relation.data[self.app]["cluster-name"] = cluster_name
-            leader_data.set("cluster_tag", "")
             return cluster_name
 
         cluster_name = f"kubernetes-{auth_webhook.token_generator().lower()}"
-        peer_relation.data[self.app]["cluster-name"] = cluster_name
+        peer_data["cluster-name"] = cluster_name
         return cluster_name
 
     def get_dns_address(self):
@@ -678,6 +857,12 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
 
     def reconcile(self, event):
         """Reconcile state change events."""
+        # Start every reconcile from a fresh snapshot of the model
+        self._context = ReconcileContext(self)
+        if self._reconcile_is_noop(event):
+            log.info("Reconcile inputs are unchanged, skipping reconcile.")
+            return
+        self._stored.last_reconcile_hash = ""
         self.install_cni_binaries()
         kubernetes_snaps.install(channel=self.model.config["channel"], control_plane=True)
         kubernetes_snaps.install_snap(
@@ -713,6 +898,51 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         else:
             self.manage_ports(self.unit.close_port)
         self.cloud_integration.integrate(event)
+        self._stored.last_reconcile_hash = self._reconcile_inputs_hash()
+
+    def _reconcile_inputs_hash(self) -> str:
+        """Digest of the config, leadership, relation data and addresses reconcile acts upon."""
+        ctx = self._context
+        relations = {}
+        for name, relation_list in self.model.relations.items():
+            for relation in relation_list:
+                entities = filter(None, [relation.app, *relation.units])
+                relations[f"{name}:{relation.id}"] = {
+                    entity.name: dict(relation.data[entity]) for entity in entities
+                }
+        inputs = {
+            "config": dict(self.model.config),
+            "leader": self.unit.is_leader(),
+            "relations": relations,
+            "root-kubeconfig": os.path.exists(ROOT_KUBECONFIG),
+            # Juju emits config-changed with unchanged config when addresses change
+            "network": {
+                "public-address": ctx.public_address,
+                "ingress-addrs": ctx.ingress_addrs,
+                "bind-addrs": ctx.bind_addrs,
+                "node-ips": ctx.node_ips,
+                "node-name": ctx.node_name,
+            },
+        }
+        dump = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.blake2b(dump.encode(), digest_size=16).hexdigest()
+
+    def _reconcile_is_noop(self, event) -> bool:
+        """Whether the last successful reconcile already handled these inputs.
+
+        Only config, relation and update-status events are considered. Any
+        other event (install, upgrade, secrets, ...) may change state that
+        isn't captured by the inputs hash and always reconciles. A unit which
+        isn't active is reconciled again regardless of its inputs.
+        """
+        skippable = (ops.ConfigChangedEvent, ops.RelationEvent, ops.UpdateStatusEvent)
+        if not isinstance(event, skippable) or isinstance(event, ops.RelationBrokenEvent):
+            return False
+        if not self._stored.last_reconcile_hash:
+            return False
+        if self._reconcile_inputs_hash() != self._stored.last_reconcile_hash:
+            return False
+        return isinstance(self.unit.status, ops.ActiveStatus)
 
     @status.on_error(ops.WaitingStatus("Waiting to manage port"))
     def manage_ports(self, port_action: Callable):
@@ -722,7 +952,7 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
     def apply_node_labels(self):
         """Request client and server certificates."""
         status.add(ops.MaintenanceStatus("Apply Node Labels"))
-        node = self.get_node_name()
+        node = self._context.node_name
         if self.node_base.active_labels() is not None:
             self.node_base.apply_node_labels()
             log.info("Node %s labelled successfully", node)
@@ -734,18 +964,17 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         """Request client and server certificates."""
         assert self.certificates.relation, "Certificates relation doesn't yet exist"
 
-        bind_addrs = kubernetes_snaps.get_bind_addresses()
-        common_name = kubernetes_snaps.get_public_address()
+        ctx = self._context
+        common_name = ctx.public_address
         config_addrs = [
             address
             for option in ["loadbalancer-ips", "ha-cluster-vip", "ha-cluster-dns"]
             for address in self.config[option].split()
             if address
         ]
-        domain = self.get_dns_domain()
-        extra_sans = self.config["extra_sans"].split()
+        domain = ctx.dns_domain
         k8s_service_addrs = kubernetes_snaps.get_kubernetes_service_addresses(
-            self.config["service-cidr"].split(",")
+            ctx.service_cidr.split(",")
         )
 
         sans = [
@@ -753,25 +982,33 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
             # won't match unless also included in the SANs as an IP field.
             common_name,
             "127.0.0.1",
-            socket.gethostname(),
-            socket.getfqdn(),
+            ctx.hostname,
+            ctx.fqdn,
             "kubernetes",
             f"kubernetes.{domain}",
             "kubernetes.default",
             "kubernetes.default.svc",
             f"kubernetes.default.svc.{domain}",
-            *node_address.by_relation(self, "kube-control", True),
+            *ctx.ingress_addrs,
         ]
-        sans += bind_addrs
+        sans += ctx.bind_addrs
         sans += config_addrs
         sans += k8s_service_addrs
         sans += filter(None, [self.k8s_api_endpoints.get_external_api_endpoint()])
         sans += filter(None, [self.k8s_api_endpoints.get_internal_api_endpoint()])
-        sans += extra_sans
+        sans += ctx.extra_sans
         sans = sorted(set(sans))
 
+        # Skip re-sending an identical request to the same certificates relation
+        request = [self.certificates.relation.id, common_name, sans]
+        digest = hashlib.sha256(json.dumps(request).encode()).hexdigest()
+        if self._stored.certificates_request_hash == digest:
+            log.debug("Certificate requests are unchanged")
+            return
+
         self.certificates.request_client_cert("system:kube-apiserver")
         self.certificates.request_server_cert(cn=common_name, sans=sans)
+        self._stored.certificates_request_hash = digest
 
     def _service_has_failed(self, service):
         try:
@@ -838,10 +1075,10 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
     @status.on_error(ops.WaitingStatus("Waiting for service-account-key"))
     def write_service_account_key(self):
         status.add(ops.MaintenanceStatus("Preparing Service Account Key"))
-        peer_relation = self.model.get_relation("peer")
-        assert peer_relation, "Peer relation isn't available"
+        peer_data = self._context.peer_app_data
+        assert peer_data is not None, "Peer relation isn't available"
 
-        key = peer_relation.data[self.app].get("service-account-key")
+        key = peer_data.get("service-account-key")
         if key:
             kubernetes_snaps.write_service_account_key(key)
             return
@@ -849,19 +1086,36 @@ class KubernetesControlPlaneCharm(ops.CharmBase):
         assert self.unit.is_leader(), f"Follower {self.unit.name} has yet to receive the key"
 
         # Check for old key in leader data
-        key = leader_data.get("/root/cdk/serviceaccount.key")
-        if key:
-            peer_relation.data[self.app]["service-account-key"] = key
-            leader_data.set("/root/cdk/serviceaccount.key", "")
+        self._migrate_leader_data(peer_data)
+        if peer_data.get("service-account-key"):
             return
 
         key = kubernetes_snaps.create_service_account_key()
-        peer_relation.data[self.app]["service-account-key"] = key
+        peer_data["service-account-key"] = key
+
+    def _migrate_leader_data(self, peer_data: ops.RelationDataContent):
+        """Move all legacy leadership data into the peer relation at once.
+
+        Leadership data is read once per reconcile, and every legacy key
+        found is copied to the peer relation and blanked with a single
+        leader-set call.
+        """
+        legacy = self._context.legacy_leader_data
+        migrated = {key: legacy[key] for key in LEGACY_LEADER_KEYS if legacy.get(key)}
+        if not migrated:
+            return
+
+        for key, value in migrated.items():
+            peer_key = LEGACY_LEADER_KEYS[key]
+            if not peer_data.get(peer_key):
+                peer_data[peer_key] = value
+        leader_data.set_many(dict.fromkeys(migrated, ""))
+        legacy.update(dict.fromkeys(migrated, ""))
 
     @status.on_error(ops.WaitingStatus("Waiting for certificates"))
     def write_certificates(self):
         """Write certificates from the certificates relation."""
-        common_name = kubernetes_snaps.get_public_address()
+        common_name = self._context.public_address
         ca = self.certificates.ca
         client_cert = self.certificates.client_certs_map.get("system:kube-apiserver")
         server_cert = self.certificates.server_certs_map.get(common_name)
@@ -1,13 +1,14 @@
 """NOTE: Leadership data is deprecated. This is used for legacy purposes."""
 
+import json
 from subprocess import check_call, check_output
 
 
-def set(key, value):
-    cmd = ["leader-set", f"{key}={value}"]
+def set_many(values):
+    cmd = ["leader-set", *(f"{key}={value}" for key, value in values.items())]
     check_call(cmd)
 
 
-def get(key):
-    cmd = ["leader-get", key]
-    return check_output(cmd).decode().strip()
+def get_all():
+    cmd = ["leader-get", "--format=json"]
+    return json.loads(check_output(cmd).decode() or "{}") or {}
@@ -6,6 +6,7 @@
 import json
 import logging
 from pathlib import Path
+from subprocess import CalledProcessError
 from unittest.mock import MagicMock, call, patch
 
 import charms.contextual_status as status
@@ -14,7 +15,7 @@ import ops.testing
 import pytest
 from ops import ActiveStatus
 
-from charm import KubernetesControlPlaneCharm
+from charm import KubernetesControlPlaneCharm, ReconcileContext
 
 
 @pytest.fixture
@@ -38,7 +39,6 @@ def harness():
 @patch("charms.kubernetes_snaps.configure_kubelet")
 @patch("charms.kubernetes_snaps.configure_scheduler")
 @patch("charms.kubernetes_snaps.configure_services_restart_always")
-@patch("charms.kubernetes_snaps.update_kubeconfig")
 @patch("charms.kubernetes_snaps.get_public_address")
 @patch("charms.kubernetes_snaps.is_snap_installed")
 @patch("charms.kubernetes_snaps.install_snap")
@@ -46,6 +46,8 @@ def harness():
 @patch("charms.kubernetes_snaps.write_certificates")
 @patch("charms.kubernetes_snaps.write_etcd_client_credentials")
 @patch("charms.kubernetes_snaps.write_service_account_key")
+@patch("charm.KubernetesControlPlaneCharm._update_kubeconfig_if_changed")
+@patch("charm.KubernetesControlPlaneCharm._write_kubeconfig_if_changed")
 @patch("charm.KubernetesControlPlaneCharm.configure_apiserver_kubelet_api_admin")
 @patch("charm.KubernetesControlPlaneCharm.install_cni_binaries")
 @patch("charm.KubernetesControlPlaneCharm.get_cloud_name")
@@ -62,6 +64,8 @@ def test_active(
     get_cloud_name,
     install_cni_binaries,
     configure_apiserver_kubelet_api_admin,
+    write_kubeconfig_if_changed,
+    update_kubeconfig_if_changed,
     write_service_account_key,
     write_etcd_client_credentials,
     write_certificates,
@@ -69,7 +73,6 @@ def test_active(
     install_snap,
     is_snap_installed,
     get_public_address,
-    update_kubeconfig,
     configure_services_restart_always,
     configure_scheduler,
     configure_kubelet,
@@ -88,6 +91,8 @@ def test_active(
     get_dns_address.return_value = "10.152.183.10"
     get_public_address.return_value = "10.0.0.10"
     hash_file.return_value = "test-hash"
+    auth_webhook_get_token.return_value = "test-token"
+    write_kubeconfig_if_changed.return_value = False
     is_snap_installed.return_value = False
 
     certificates_relation_id = harness.add_relation("certificates", "easyrsa")
@@ -215,7 +220,10 @@ def test_active(
         extra_args_config="", kubeconfig="/root/cdk/kubeschedulerconfig"
     )
     configure_services_restart_always.assert_called_once_with(control_plane=True)
-    update_kubeconfig.assert_called()
+    update_kubeconfig_if_changed.assert_called_once_with(
+        Path("/root/.kube/config"), ca="test-ca", server="https://127.0.0.1:6443"
+    )
+    assert write_kubeconfig_if_changed.call_count == 7
     install_snap.assert_called()
     install_cni_binaries.assert_called()
     set_default_cni_conf_file.assert_called_once_with("10-calico.conflist")
@@ -282,3 +290,285 @@ def test_ignore_missing_cni(set_default_cni_conf_file, harness, caplog):
         assert len(infos) == 1, "There should be only one info level log"
         assert ["Ignoring missing CNI configuration as per user request."] == infos
         set_default_cni_conf_file.assert_called_once_with(None)
+
+
+@patch("charms.kubernetes_snaps.get_public_address")
+def test_reconcile_context_memoizes(get_public_address, harness):
+    """Verify lookups are made once per reconcile context."""
+    get_public_address.return_value = "10.0.0.10"
+    harness.disable_hooks()
+    harness.begin()
+
+    ctx = harness.charm._context
+    assert ctx.public_address == "10.0.0.10"
+    assert ctx.public_address == "10.0.0.10"
+    get_public_address.assert_called_once_with()
+
+    harness.update_config({"service-cidr": "10.152.184.0/24"})
+    assert ctx.service_cidr == "10.152.184.0/24"
+
+
+@patch("charms.kubernetes_snaps.create_kubeconfig")
+def test_write_kubeconfig_if_changed(create_kubeconfig, harness, tmp_path):
+    """Verify kubeconfigs are only rewritten when their inputs change."""
+    create_kubeconfig.side_effect = lambda dest, **_: Path(dest).write_text("kubeconfig")
+    harness.disable_hooks()
+    harness.begin()
+    dest = str(tmp_path / "kubeconfig")
+    kwargs = {
+        "ca": "test-ca",
+        "server": "https://10.0.0.10:6443",
+        "token": "test-token",
+        "user": "admin",
+    }
+
+    assert harness.charm._write_kubeconfig_if_changed(dest, **kwargs)
+    assert not harness.charm._write_kubeconfig_if_changed(dest, **kwargs)
+    create_kubeconfig.assert_called_once_with(f"{dest}.tmp", **kwargs)
+    assert Path(dest).read_text() == "kubeconfig"
+    assert Path(dest).stat().st_mode & 0o777 == 0o600
+    assert not Path(f"{dest}.tmp").exists()
+
+    kwargs["token"] = "other-token"
+    harness.charm._write_kubeconfig_if_changed(dest, **kwargs)
+    assert create_kubeconfig.call_count == 2
+
+
+@patch("auth_webhook.token_generator", MagicMock(return_value="bootstrap-token"))
+@patch("charms.kubernetes_snaps.create_kubeconfig")
+@patch("charms.kubernetes_snaps.update_kubeconfig")
+def test_update_kubeconfig_if_changed(update_kubeconfig, create_kubeconfig, harness, tmp_path):
+    """Verify the admin kubeconfig is only updated when its CA or server change."""
+    create_kubeconfig.side_effect = lambda dest, **_: Path(dest).write_text("bootstrap\n")
+    update_kubeconfig.side_effect = lambda dest, **_: Path(dest).write_text(
+        Path(dest).read_text() + "updated\n"
+    )
+    harness.disable_hooks()
+    harness.begin()
+    dest = tmp_path / "config"
+    Path(f"{dest}.hash").write_text("stale")
+
+    harness.charm._update_kubeconfig_if_changed(str(dest), ca="test-ca", server="https://a:6443")
+    create_kubeconfig.assert_called_once_with(
+        f"{dest}.tmp", ca="test-ca", server="https://a:6443", token="bootstrap-token", user="admin"
+    )
+    update_kubeconfig.assert_not_called()
+    assert dest.read_text() == "bootstrap\n"
+    assert not Path(f"{dest}.hash").exists()
+
+    harness.charm._update_kubeconfig_if_changed(str(dest), ca="test-ca", server="https://a:6443")
+    update_kubeconfig.assert_not_called()
+
+    harness.charm._update_kubeconfig_if_changed(str(dest), ca="test-ca", server="https://b:6443")
+    update_kubeconfig.assert_called_once_with(
+        f"{dest}.tmp", ca="test-ca", server="https://b:6443", token=None, user="admin"
+    )
+    assert dest.read_text() == "bootstrap\nupdated\n"
+    assert dest.stat().st_mode & 0o777 == 0o600
+    assert not Path(f"{dest}.tmp").exists()
+
+
+@patch("charms.kubernetes_snaps.create_kubeconfig")
+def test_staged_kubeconfig_cleanup(create_kubeconfig, harness, tmp_path):
+    """Verify staged kubeconfigs are private and removed when writing fails."""
+    modes = []
+
+    def create(dest, **_):
+        modes.append(Path(dest).stat().st_mode & 0o777)
+        Path(dest).write_text("token")
+        raise CalledProcessError(1, "kubectl")
+
+    create_kubeconfig.side_effect = create
+    harness.disable_hooks()
+    harness.begin()
+    dest = tmp_path / "kubeconfig"
+    Path(f"{dest}.tmp").write_text("leftover")
+
+    with pytest.raises(CalledProcessError):
+        harness.charm._write_kubeconfig_if_changed(
+            str(dest), ca="test-ca", server="https://a:6443", token="test-token", user="admin"
+        )
+    assert modes == [0o600]
+    assert not Path(f"{dest}.tmp").exists()
+    assert not dest.exists()
+
+
+@patch("auth_webhook.create_token")
+def test_cached_token(create_token, harness):
+    """Verify tokens are only created once per reconcile."""
+    create_token.return_value = "test-token"
+    harness.disable_hooks()
+    harness.begin()
+
+    for _ in range(2):
+        token = harness.charm._cached_token(uid="admin", username="admin", groups=["admins"])
+        assert token == "test-token"
+    create_token.assert_called_once_with(uid="admin", username="admin", groups=["admins"])
+
+
+@patch("charms.kubernetes_snaps.get_kubernetes_service_addresses")
+@patch("charms.kubernetes_snaps.get_bind_addresses")
+@patch("charms.kubernetes_snaps.get_public_address")
+@patch("ops.interface_tls_certificates.CertificatesRequires.request_server_cert")
+@patch("ops.interface_tls_certificates.CertificatesRequires.request_client_cert")
+def test_request_certificates_unchanged(
+    request_client_cert,
+    request_server_cert,
+    get_public_address,
+    get_bind_addresses,
+    get_kubernetes_service_addresses,
+    harness,
+):
+    """Verify identical certificate requests are only sent once."""
+    get_public_address.return_value = "10.0.0.10"
+    get_bind_addresses.return_value = ["10.0.0.10"]
+    get_kubernetes_service_addresses.return_value = ["10.152.183.1"]
+    harness.disable_hooks()
+    harness.add_relation("certificates", "easyrsa")
+    harness.begin()
+
+    harness.charm.request_certificates()
+    harness.charm.request_certificates()
+    request_client_cert.assert_called_once_with("system:kube-apiserver")
+    request_server_cert.assert_called_once()
+
+    harness.update_config({"extra_sans": "api.example.com"})
+    harness.charm._context = ReconcileContext(harness.charm)
+    harness.charm.request_certificates()
+    assert request_server_cert.call_count == 2
+    assert "api.example.com" in request_server_cert.call_args.kwargs["sans"]
+
+
+@patch("charm.KubernetesControlPlaneCharm.get_node_name", MagicMock(return_value="node-0"))
+@patch("charms.kubernetes_snaps.get_bind_addresses", MagicMock(return_value=["10.0.0.10"]))
+@patch("charms.kubernetes_snaps.get_public_address", MagicMock(return_value="10.0.0.10"))
+def test_reconcile_is_noop(harness):
+    """Verify reconcile is only skipped when none of its inputs changed."""
+    harness.disable_hooks()
+    harness.begin()
+    charm = harness.charm
+    config_changed = MagicMock(spec=ops.ConfigChangedEvent)
+
+    assert not charm._reconcile_is_noop(config_changed)
+
+    charm._stored.last_reconcile_hash = charm._reconcile_inputs_hash()
+    charm.unit.status = ActiveStatus("Ready")
+    assert charm._reconcile_is_noop(config_changed)
+    assert not charm._reconcile_is_noop(MagicMock(spec=ops.UpgradeCharmEvent))
+
+    harness.update_config({"extra_sans": "api.example.com"})
+    assert not charm._reconcile_is_noop(config_changed)
+
+    charm._stored.last_reconcile_hash = charm._reconcile_inputs_hash()
+    charm.unit.status = ops.WaitingStatus("Waiting for etcd")
+    assert not charm._reconcile_is_noop(config_changed)
+
+
+@patch("charm.KubernetesControlPlaneCharm.get_node_name", MagicMock(return_value="node-0"))
+@patch("charms.kubernetes_snaps.get_bind_addresses", MagicMock(return_value=["10.0.0.10"]))
+@patch("charms.kubernetes_snaps.get_public_address")
+def test_reconcile_not_noop_on_address_change(get_public_address, harness):
+    """Verify an address change alone is enough to reconcile again."""
+    get_public_address.return_value = "10.0.0.10"
+    harness.disable_hooks()
+    harness.begin()
+    charm = harness.charm
+    config_changed = MagicMock(spec=ops.ConfigChangedEvent)
+
+    charm._stored.last_reconcile_hash = charm._reconcile_inputs_hash()
+    charm.unit.status = ActiveStatus("Ready")
+    assert charm._reconcile_is_noop(config_changed)
+
+    # Juju emits config-changed with unchanged config when the address moves
+    get_public_address.return_value = "10.0.0.20"
+    charm._context = ReconcileContext(charm)
+    assert not charm._reconcile_is_noop(config_changed)
+
+
+@patch("leader_data.set_many")
+@patch("leader_data.get_all")
+def test_migrate_leader_data(get_all, set_many, harness):
+    """Verify legacy leader data is migrated with a single leader-get and leader-set."""
+    get_all.return_value = {
+        "cluster_tag": "test-cluster-name",
+        "/root/cdk/serviceaccount.key": "test-service-account-key",
+    }
+    harness.disable_hooks()
+    peer_relation_id = harness.add_relation("peer", "kubernetes-control-plane")
+    harness.set_leader(True)
+    harness.begin()
+
+    assert harness.charm.get_cluster_name() == "test-cluster-name"
+    harness.charm.write_service_account_key()
+
+    get_all.assert_called_once_with()
+    set_many.assert_called_once_with({"cluster_tag": "", "/root/cdk/serviceaccount.key": ""})
+    peer_data = harness.get_relation_data(peer_relation_id, "kubernetes-control-plane")
+    assert peer_data["cluster-name"] == "test-cluster-name"
+    assert peer_data["service-account-key"] == "test-service-account-key"
+
+
+@patch("os.sync")
+@patch("auth_webhook.create_token")
+@patch("charms.kubernetes_snaps.create_kubeconfig")
+@patch("charm.KubernetesControlPlaneCharm._update_kubeconfig_if_changed", MagicMock())
+@patch("charm.KubernetesControlPlaneCharm.get_node_name", MagicMock(return_value="node-0"))
+@patch("k8s_api_endpoints.K8sApiEndpoints.external", MagicMock(return_value="https://10.0.0.10"))
+def test_create_kubeconfigs(create_kubeconfig, create_token, sync, harness, tmp_path, monkeypatch):
+    """Verify kubeconfigs are written concurrently and failures surface as status."""
+
+    def create(dest, ca, server, token, user):
+        if Path(dest).name == "kubeproxyconfig.tmp" and token == "bad-token":
+            raise CalledProcessError(1, "kubectl")
+        Path(dest).parent.mkdir(parents=True, exist_ok=True)
+        Path(dest).write_text(f"{server} {user} {token}")
+
+    create_kubeconfig.side_effect = create
+    create_token.return_value = "test-token"
+    harness.disable_hooks()
+    relation_id = harness.add_relation("certificates", "easyrsa")
+    harness.add_relation_unit(relation_id, "easyrsa/0")
+    harness.update_relation_data(relation_id, "easyrsa/0", {"ca": "test-ca"})
+    harness.begin()
+    charm = harness.charm
+
+    # Redirect every kubeconfig into the temporary directory
+    write = charm._write_kubeconfig_if_changed
+    monkeypatch.setattr(
+        charm,
+        "_write_kubeconfig_if_changed",
+        lambda dest, **kwargs: write(str(tmp_path / str(dest).lstrip("/")), **kwargs),
+    )
+
+    charm.create_kubeconfigs()
+    written = sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*config"))
+    assert written == [
+        "home/ubuntu/.kube/config",
+        "home/ubuntu/config",
+        "root/.kube/config",
+        "root/cdk/kubeconfig",
+        "root/cdk/kubecontrollermanagerconfig",
+        "root/cdk/kubeproxyconfig",
+        "root/cdk/kubeschedulerconfig",
+    ]
+    assert create_kubeconfig.call_count == 7
+    sync.assert_called_once_with()
+
+    # Nothing changed, so nothing is written or synced
+    sync.reset_mock()
+    charm.create_kubeconfigs()
+    assert create_kubeconfig.call_count == 7
+    sync.assert_not_called()
+
+    # A failing worker surfaces as the create_kubeconfigs status
+    create_token.return_value = "bad-token"
+    charm._context = ReconcileContext(charm)
+    with status.context(charm.unit):
+        with pytest.raises(status.ReconcilerError):
+            charm.create_kubeconfigs()
+    assert charm.unit.status == ops.WaitingStatus("Waiting for Auth Tokens")
+    sync.assert_called_once_with()
+    # Every other kubeconfig was still replaced before the sync
+    rewritten = [p for p in tmp_path.rglob("*config") if p.read_text().endswith("bad-token")]
+    assert len(rewritten) == 6
+    assert not (tmp_path / "root/cdk/kubeproxyconfig.tmp").exists()